@@ -10,6 +10,7 @@ import os
 import sys
 from pathlib import Path
 import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pdf_processor import PDFProcessor
 
 def setup_logging(verbose=False):
@@ -41,14 +42,32 @@ def validate_directories(input_dir, output_dir):
 
 def get_pdf_files(input_dir):
     """Get list of PDF files from input directory"""
-    pdf_files = list(input_dir.glob("*.pdf"))
-    pdf_files.extend(list(input_dir.glob("*.PDF")))
+    # Single directory scan, matching the extension case-insensitively
+    pdf_files = [path for path in input_dir.iterdir() if path.is_file() and path.suffix.lower() == ".pdf"]
     
     if not pdf_files:
         logging.warning(f"No PDF files found in {input_dir}")
     
     return pdf_files
 
+def _process_one(pdf_file, max_pages, output_dir):
+    """Process a single PDF in a worker process and save its JSON result"""
+    # PyMuPDF objects are not picklable, so each worker builds its own processor
+    processor = PDFProcessor(max_pages=max_pages)
+    start_time = time.time()
+    try:
+        result = processor.process_pdf(pdf_file)
+        
+        # Generate output filename
+        output_path = output_dir / (pdf_file.stem + ".json")
+        
+        # Save result
+        processor.save_result(result, output_path)
+        
+        return pdf_file.name, True, None, time.time() - start_time
+    except Exception as e:
+        return pdf_file.name, False, str(e), time.time() - start_time
+
 def main():
     parser = argparse.ArgumentParser(
         description="Extract structured outlines and table data from PDF files with full Unicode support"
@@ -74,6 +93,12 @@ def main():
         default=50,
         help="Maximum number of pages to process per PDF (default: 50)"
     )
+    parser.add_argument(
+        "--workers", "-w",
+        type=int,
+        default=min(os.cpu_count() or 1, 4),
+        help="Number of worker processes for parallel PDF processing (default: min(cpu_count, 4))"
+    )
     
     args = parser.parse_args()
     
@@ -98,35 +123,26 @@ def main():
             logging.info("No PDF files to process. Exiting.")
             return 0
         
-        # Initialize processor
-        processor = PDFProcessor(max_pages=args.max_pages)
+        # Process PDF files in parallel, one worker process per file
+        workers = max(1, min(args.workers, len(pdf_files)))
+        logging.info(f"Using {workers} worker process(es)")
         
-        # Process each PDF file
         success_count = 0
         total_start_time = time.time()
         
-        for i, pdf_file in enumerate(pdf_files, 1):
-            logging.info(f"Processing file {i}/{len(pdf_files)}: {pdf_file.name}")
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_process_one, pdf_file, args.max_pages, output_dir)
+                for pdf_file in pdf_files
+            ]
             
-            start_time = time.time()
-            try:
-                result = processor.process_pdf(pdf_file)
-                
-                # Generate output filename
-                output_filename = pdf_file.stem + ".json"
-                output_path = output_dir / output_filename
-                
-                # Save result
-                processor.save_result(result, output_path)
-                
-                processing_time = time.time() - start_time
-                logging.info(f"Successfully processed {pdf_file.name} in {processing_time:.2f} seconds")
-                success_count += 1
-                
-            except Exception as e:
-                processing_time = time.time() - start_time
-                logging.error(f"Failed to process {pdf_file.name} after {processing_time:.2f} seconds: {str(e)}")
-                continue
+            for i, future in enumerate(as_completed(futures), 1):
+                name, ok, error, processing_time = future.result()
+                if ok:
+                    logging.info(f"[{i}/{len(pdf_files)}] Successfully processed {name} in {processing_time:.2f} seconds")
+                    success_count += 1
+                else:
+                    logging.error(f"[{i}/{len(pdf_files)}] Failed to process {name} after {processing_time:.2f} seconds: {error}")
         
         total_time = time.time() - total_start_time
         logging.info(f"Processing complete: {success_count}/{len(pdf_files)} files successful")
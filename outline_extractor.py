@@ -5,11 +5,57 @@ Extract structured document outline from PDF files with multilingual support
 import logging
 import re
 import unicodedata
-from typing import Dict, List, Any, Tuple
+from dataclasses import dataclass
+from operator import itemgetter
+from typing import Dict, List, Any, Optional
 
 import fitz  # PyMuPDF
+import numpy as np
 
-from utils import normalize_unicode_text, is_likely_heading, get_text_direction
+from utils import normalize_unicode_text, is_likely_heading, get_text_direction, detect_document_language
+
+# Document languages (as reported by detect_document_language) written right-to-left
+_RTL_LANGUAGES = ('arabic', 'hebrew')
+
+# PyMuPDF span flag bit for bold text
+_FONT_FLAG_BOLD = 1 << 4
+
+# Text extraction flags for get_text("dict"): image blocks are skipped anyway, so
+# leave out TEXT_PRESERVE_IMAGES to avoid decoding and copying their pixel data
+_TEXT_FLAGS = fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES
+
+def _score_font_features(sizes: np.ndarray, flags: np.ndarray, avg_font_size: float) -> np.ndarray:
+    """Font size and bold components of the heading confidence for every span"""
+    scores = np.zeros_like(sizes)
+    scores += 0.3 * (sizes > avg_font_size * 1.2)
+    scores += 0.2 * (sizes > avg_font_size * 1.5)
+    scores += 0.2 * ((flags & _FONT_FLAG_BOLD) != 0)
+    return scores
+
+@dataclass
+class PageSpans:
+    """Text spans stored as parallel arrays (one entry per span)"""
+    texts: List[str]
+    sizes: np.ndarray
+    flags: np.ndarray
+    pages: np.ndarray
+    
+    def __len__(self) -> int:
+        return len(self.texts)
+    
+    @classmethod
+    def concatenate(cls, spans: List["PageSpans"]) -> "PageSpans":
+        """Join the spans of several pages into one set of arrays"""
+        texts = [text for page_spans in spans for text in page_spans.texts]
+        if not spans:
+            return cls(texts, np.empty(0, dtype=np.float64), np.empty(0, dtype=np.uint16), np.empty(0, dtype=np.uint16))
+        
+        return cls(
+            texts,
+            np.concatenate([page_spans.sizes for page_spans in spans]),
+            np.concatenate([page_spans.flags for page_spans in spans]),
+            np.concatenate([page_spans.pages for page_spans in spans])
+        )
 
 class OutlineExtractor:
     """Extract document outline with heading hierarchy detection"""
@@ -28,6 +74,11 @@ class OutlineExtractor:
                 r'^\d+\.?\s+[\u0600-\u06FF]',
                 r'^[\u0600-\u06FF\s]{3,}$'
             ],
+            'hebrew': [
+                r'^(פרק|סעיף|חלק)\s+\d+',
+                r'^\d+\.?\s+[\u0590-\u05FF]',
+                r'^[\u0590-\u05FF\s]{3,}$'
+            ],
             'chinese': [
                 r'^第[一二三四五六七八九十\d]+章',
                 r'^第[一二三四五六七八九十\d]+节',
@@ -39,22 +90,42 @@ class OutlineExtractor:
             ]
         }
         
+        # Compile heading patterns once; they are matched against every text span
+        self._compiled_patterns = {
+            language: [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
+            for language, patterns in self.heading_patterns.items()
+        }
+        
+        # Patterns tried for each language: its own script's, then the English ones,
+        # since Latin text (e.g. "Chapter 2 Methods") also appears in other documents
+        self._pattern_chains = {
+            language: patterns if language == 'english' else patterns + self._compiled_patterns['english']
+            for language, patterns in self._compiled_patterns.items()
+        }
+        
         # Minimum confidence threshold for heading detection
         self.min_heading_confidence = 0.6
+        
+        # Number of leading pages sampled for language detection
+        self.language_sample_pages = 3
     
     def extract_outline(self, pdf_doc: fitz.Document, max_pages: int) -> Dict[str, Any]:
         """
         Extract structured outline from PDF document
         
+        The text of the first pages is sampled during the same pass to detect the
+        document language, which also selects the heading patterns.
+        
         Args:
             pdf_doc: PyMuPDF document object
             max_pages: Maximum number of pages to process
             
         Returns:
-            Dictionary with title and outline data
+            Dictionary with title, language and outline data
         """
         outline_data = {
             "title": "",
+            "language": "unknown",
             "outline": []
         }
         
@@ -64,24 +135,36 @@ class OutlineExtractor:
             outline_data["outline"] = self._process_built_in_outline(toc, max_pages)
             if outline_data["outline"]:
                 logging.debug("Using built-in PDF outline")
+                sample_text = ""
+                for page in pdf_doc.pages(0, min(self.language_sample_pages, max_pages, len(pdf_doc))):
+                    sample_text += normalize_unicode_text(page.get_text())[:1000]
+                outline_data["language"] = detect_document_language(sample_text)
                 return outline_data
         
         # Fallback to text analysis
         logging.debug("No built-in outline found, analyzing text structure")
         
-        # Collect text blocks with formatting information
-        text_blocks = []
-        for page_num in range(max_pages):
+        # Collect text spans with formatting information, sampling the plain
+        # text of the first pages for language detection. Pages are read
+        # serially: PyMuPDF documents are not thread-safe and hold the GIL, so
+        # parallelism happens per file in main.py instead
+        page_spans = []
+        sample_text = ""
+        for page_num, page in enumerate(pdf_doc.pages(0, min(max_pages, len(pdf_doc)))):
             try:
-                page = pdf_doc[page_num]
-                blocks = self._extract_text_blocks(page, page_num + 1)
-                text_blocks.extend(blocks)
+                sample_lines = [] if page_num < self.language_sample_pages else None
+                page_spans.append(self._extract_text_blocks(page, page_num + 1, sample_lines))
+                if sample_lines is not None:
+                    sample_text += normalize_unicode_text("\n".join(sample_lines))[:1000]
             except Exception as e:
                 logging.warning(f"Failed to process page {page_num + 1}: {str(e)}")
                 continue
         
+        language = detect_document_language(sample_text)
+        outline_data["language"] = language
+        
         # Analyze and classify headings
-        headings = self._analyze_headings(text_blocks)
+        headings = self._analyze_headings(PageSpans.concatenate(page_spans), language)
         outline_data["outline"] = self._build_outline_hierarchy(headings)
         
         return outline_data
@@ -118,117 +201,124 @@ class OutlineExtractor:
         
         return outline
     
-    def _extract_text_blocks(self, page: fitz.Page, page_num: int) -> List[Dict[str, Any]]:
-        """Extract text blocks with formatting information"""
-        blocks = []
+    def _extract_text_blocks(self, page: fitz.Page, page_num: int,
+                             sample_lines: Optional[List[str]] = None) -> PageSpans:
+        """Extract text spans with the font size and flags of each span
+        
+        If sample_lines is given, the plain text of every line is appended to it.
+        """
+        texts = []
+        sizes = []
+        flags = []
         
         try:
             # Get text with formatting details
-            text_dict = page.get_text("dict")
+            text_dict = page.get_text("dict", flags=_TEXT_FLAGS)
             
             for block in text_dict.get("blocks", []):
                 if "lines" not in block:  # Skip image blocks
                     continue
                 
                 for line in block["lines"]:
+                    if sample_lines is not None:
+                        sample_lines.append("".join(span.get("text", "") for span in line["spans"]))
+                    
                     for span in line["spans"]:
                         text = span.get("text", "").strip()
                         if not text:
                             continue
                         
-                        # Normalize text
-                        normalized_text = normalize_unicode_text(text)
-                        if not normalized_text:
+                        # Skip invisible or degenerate text
+                        size = span.get("size", 0)
+                        if size < 1.0:
                             continue
                         
-                        # Extract formatting information
-                        font_info = {
-                            "font": span.get("font", ""),
-                            "size": span.get("size", 0),
-                            "flags": span.get("flags", 0),  # Bold, italic, etc.
-                            "bbox": span.get("bbox", [0, 0, 0, 0])
-                        }
+                        # Text too short or long to be a heading only contributes its
+                        # size to the font statistics, so skip normalizing it
+                        if not 2 <= len(text) <= 200:
+                            normalized_text = ""
+                        else:
+                            normalized_text = normalize_unicode_text(text)
+                            if not normalized_text:
+                                continue
                         
-                        blocks.append({
-                            "text": normalized_text,
-                            "page": page_num,
-                            "font_info": font_info,
-                            "line_bbox": line.get("bbox", [0, 0, 0, 0])
-                        })
+                        # Extract formatting information
+                        texts.append(normalized_text)
+                        sizes.append(size)
+                        flags.append(span.get("flags", 0))  # Bold, italic, etc.
             
         except Exception as e:
             logging.warning(f"Failed to extract text blocks from page {page_num}: {str(e)}")
         
-        return blocks
+        return PageSpans(
+            texts,
+            np.fromiter(sizes, dtype=np.float64, count=len(sizes)),
+            np.fromiter(flags, dtype=np.uint16, count=len(flags)),
+            np.full(len(texts), page_num, dtype=np.uint16)
+        )
     
-    def _analyze_headings(self, text_blocks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Analyze text blocks to identify potential headings"""
+    def _analyze_headings(self, spans: PageSpans, language: str = "english") -> List[Dict[str, Any]]:
+        """Analyze text spans to identify potential headings"""
         headings = []
         
-        if not text_blocks:
+        if not len(spans):
             return headings
         
         # Calculate font size statistics for relative size analysis
-        font_sizes = [block["font_info"]["size"] for block in text_blocks if block["font_info"]["size"] > 0]
-        if not font_sizes:
+        sizes = spans.sizes
+        font_sizes = sizes[sizes > 0]
+        if not font_sizes.size:
             return headings
         
-        avg_font_size = sum(font_sizes) / len(font_sizes)
-        max_font_size = max(font_sizes)
+        avg_font_size = float(font_sizes.mean())
         
-        for block in text_blocks:
-            text = block["text"]
-            font_info = block["font_info"]
-            
-            # Skip very short or very long text
-            if len(text) < 2 or len(text) > 200:
-                continue
+        # Font size and bold components of the confidence score for all spans at once
+        font_confidence = _score_font_features(sizes, spans.flags, avg_font_size)
+        
+        # Only spans of heading length need the text checks; with the current weights
+        # the text factors alone (up to 0.7) can reach the threshold, so the font
+        # score cannot rule any span out
+        lengths = np.fromiter(map(len, spans.texts), dtype=np.int64, count=len(spans))
+        candidates = np.flatnonzero((lengths >= 2) & (lengths <= 200))
+        
+        base_confidences = font_confidence.tolist()
+        font_size_list = sizes.tolist()
+        page_list = spans.pages.tolist()
+        
+        for idx in candidates.tolist():
+            text = spans.texts[idx]
+            font_size = font_size_list[idx]
             
             # Calculate heading confidence score
-            confidence = self._calculate_heading_confidence(text, font_info, avg_font_size, max_font_size)
+            confidence = self._add_text_confidence(base_confidences[idx], text, language)
             
             if confidence >= self.min_heading_confidence:
-                heading_level = self._determine_heading_level(font_info, avg_font_size, confidence)
+                heading_level = self._determine_heading_level(font_size, avg_font_size, confidence)
                 
                 headings.append({
                     "text": text,
-                    "page": block["page"],
+                    "page": page_list[idx],
                     "level": heading_level,
                     "confidence": confidence,
-                    "font_size": font_info["size"]
+                    "font_size": font_size
                 })
         
         # Sort by page and position
-        headings.sort(key=lambda x: (x["page"], x.get("font_size", 0)), reverse=False)
+        headings.sort(key=itemgetter("page", "font_size"))
         
         return headings
     
-    def _calculate_heading_confidence(self, text: str, font_info: Dict, avg_font_size: float, max_font_size: float) -> float:
-        """Calculate confidence score for text being a heading"""
-        confidence = 0.0
-        
-        # Font size factor
-        font_size = font_info.get("size", 0)
-        if font_size > avg_font_size * 1.2:
-            confidence += 0.3
-        if font_size > avg_font_size * 1.5:
-            confidence += 0.2
-        
-        # Bold text
-        flags = font_info.get("flags", 0)
-        if flags & 2**4:  # Bold flag
-            confidence += 0.2
-        
+    def _add_text_confidence(self, confidence: float, text: str, language: str) -> float:
+        """Add text content and shape factors to a font-based confidence score"""
         # Text characteristics
         if is_likely_heading(text):
             confidence += 0.3
         
         # Pattern matching
-        text_direction = get_text_direction(text)
-        patterns = self.heading_patterns.get('english', [])  # Default to English patterns
+        patterns = self._select_patterns(text, language)
         
         for pattern in patterns:
-            if re.search(pattern, text, re.IGNORECASE):
+            if pattern.search(text):
                 confidence += 0.2
                 break
         
@@ -244,10 +334,16 @@ class OutlineExtractor:
         
         return min(confidence, 1.0)
     
-    def _determine_heading_level(self, font_info: Dict, avg_font_size: float, confidence: float) -> str:
-        """Determine heading level based on font characteristics"""
-        font_size = font_info.get("size", 0)
+    def _select_patterns(self, text: str, language: str) -> List[re.Pattern]:
+        """Select compiled heading patterns for the document language, per span for mixed scripts"""
+        # Right-to-left spans in a left-to-right document use their own script's patterns
+        if language not in _RTL_LANGUAGES and get_text_direction(text) == "rtl":
+            language = detect_document_language(text)
         
+        return self._pattern_chains.get(language, self._pattern_chains['english'])
+    
+    def _determine_heading_level(self, font_size: float, avg_font_size: float, confidence: float) -> str:
+        """Determine heading level based on font characteristics"""
         if font_size > avg_font_size * 1.8:
             return "H1"
         elif font_size > avg_font_size * 1.4:
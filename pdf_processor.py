@@ -7,14 +7,18 @@ import logging
 import time
 import unicodedata
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, BinaryIO
 
 import fitz  # PyMuPDF
-import pdfplumber
+
+try:
+    import orjson
+except ImportError:  # Optional faster JSON writer
+    orjson = None
 
 from outline_extractor import OutlineExtractor
 from table_extractor import TableExtractor
-from utils import normalize_unicode_text, detect_document_language
+from utils import normalize_unicode_text
 
 class PDFProcessor:
     """Main processor for extracting outlines and tables from PDFs"""
@@ -43,9 +47,32 @@ class PDFProcessor:
         if pdf_path.stat().st_size == 0:
             raise ValueError(f"PDF file is empty: {pdf_path}")
         
+        return self._process_document(start_time, pdf_path.name, pdf_path.stem, filename=str(pdf_path))
+    
+    def process_stream(self, stream: BinaryIO, filename: str) -> Dict[str, Any]:
+        """
+        Process a PDF read from a binary stream (e.g. an upload) without writing it to disk
+        
+        Args:
+            stream: Readable binary stream with the PDF content
+            filename: Name reported in the result
+            
+        Returns:
+            Dictionary containing extracted data
+        """
+        start_time = time.time()
+        
+        data = stream.read()
+        if not data:
+            raise ValueError(f"PDF file is empty: {filename}")
+        
+        return self._process_document(start_time, filename, Path(filename).stem, stream=data, filetype="pdf")
+    
+    def _process_document(self, start_time: float, name: str, stem: str, **open_args) -> Dict[str, Any]:
+        """Extract outline and table data from a PDF opened with fitz.open(**open_args)"""
         # Initialize result structure
         result = {
-            "filename": pdf_path.name,
+            "filename": name,
             "title": "",
             "language": "unknown",
             "outline": [],
@@ -57,7 +84,7 @@ class PDFProcessor:
         
         try:
             # Open PDF with PyMuPDF for outline extraction
-            with fitz.open(str(pdf_path)) as pdf_doc:
+            with fitz.open(**open_args) as pdf_doc:
                 page_count = min(len(pdf_doc), self.max_pages)
                 result["page_count"] = page_count
                 
@@ -71,33 +98,25 @@ class PDFProcessor:
                 if metadata and metadata.get('title'):
                     result["title"] = normalize_unicode_text(metadata['title'])
                 
-                # Detect document language from first few pages
-                sample_text = ""
-                for page_num in range(min(3, page_count)):
-                    page = pdf_doc[page_num]
-                    page_text = page.get_text()
-                    sample_text += normalize_unicode_text(page_text)[:1000]
-                
-                result["language"] = detect_document_language(sample_text)
-                
-                # Extract outline
+                # Extract outline; the language is detected from text sampled during
+                # the same pass over the pages
                 try:
                     outline_data = self.outline_extractor.extract_outline(pdf_doc, page_count)
                     result["outline"] = outline_data["outline"]
+                    result["language"] = outline_data["language"]
                     if not result["title"] and outline_data.get("title"):
                         result["title"] = outline_data["title"]
                 except Exception as e:
                     logging.warning(f"Outline extraction failed: {str(e)}")
                     result["errors"].append(f"Outline extraction: {str(e)}")
-            
-            # Open PDF with pdfplumber for table extraction
-            try:
-                with pdfplumber.open(str(pdf_path)) as pdf:
-                    tables_data = self.table_extractor.extract_tables(pdf, page_count)
+                
+                # Extract tables from the same open document
+                try:
+                    tables_data = self.table_extractor.extract_tables(pdf_doc, page_count)
                     result["tables"] = tables_data
-            except Exception as e:
-                logging.warning(f"Table extraction failed: {str(e)}")
-                result["errors"].append(f"Table extraction: {str(e)}")
+                except Exception as e:
+                    logging.warning(f"Table extraction failed: {str(e)}")
+                    result["errors"].append(f"Table extraction: {str(e)}")
             
             # If no title found, try to extract from first heading
             if not result["title"] and result["outline"]:
@@ -107,7 +126,7 @@ class PDFProcessor:
             
             # Fallback title
             if not result["title"]:
-                result["title"] = pdf_path.stem
+                result["title"] = stem
             
             processing_time = time.time() - start_time
             result["processing_time"] = round(processing_time, 3)
@@ -131,8 +150,15 @@ class PDFProcessor:
             output_path: Path where to save the JSON file
         """
         try:
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(result, f, ensure_ascii=False, indent=2, sort_keys=True)
+            if orjson is not None:
+                data = orjson.dumps(
+                    result,
+                    option=orjson.OPT_SORT_KEYS | orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+                )
+                output_path.write_bytes(data)
+            else:
+                with open(output_path, 'w', encoding='utf-8') as f:
+                    json.dump(result, f, ensure_ascii=False, indent=2, sort_keys=True)
             
             logging.debug(f"Results saved to {output_path}")
             
@@ -57,9 +57,9 @@ if ! command -v python3 &> /dev/null; then
 fi
 
 # Check if required Python packages are available
-python3 -c "import fitz, pdfplumber" 2>/dev/null || {
+python3 -c "import fitz, numpy" 2>/dev/null || {
     echo "Error: Required Python packages are not installed"
-    echo "Please install: PyMuPDF and pdfplumber"
+    echo "Please install: PyMuPDF and numpy"
     exit 1
 }
 
@@ -3,10 +3,9 @@ Extract table data from PDF files with multilingual support
 """
 
 import logging
-import re
 from typing import Dict, List, Any, Optional
 
-import pdfplumber
+import fitz  # PyMuPDF
 
 from utils import normalize_unicode_text, detect_table_structure
 
@@ -18,28 +17,25 @@ class TableExtractor:
         self.min_rows = 2
         self.min_cols = 2
         
-        # Table detection settings
+        # Table detection settings (PyMuPDF Page.find_tables keyword arguments)
         self.table_settings = {
-            "vertical_strategy": "lines_strict",
-            "horizontal_strategy": "lines_strict",
-            "intersection_strategy": "lines_strict",
+            "strategy": "lines_strict",
             "snap_tolerance": 3,
             "join_tolerance": 3,
             "edge_min_length": 3,
             "min_words_vertical": 1,
             "min_words_horizontal": 1,
-            "keep_blank_chars": False,
             "text_tolerance": 3,
             "text_x_tolerance": 3,
             "text_y_tolerance": 3
         }
     
-    def extract_tables(self, pdf: pdfplumber.PDF, max_pages: int) -> List[Dict[str, Any]]:
+    def extract_tables(self, pdf_doc: fitz.Document, max_pages: int) -> List[Dict[str, Any]]:
         """
         Extract all tables from PDF with multilingual support
         
         Args:
-            pdf: pdfplumber PDF object
+            pdf_doc: PyMuPDF document object
             max_pages: Maximum number of pages to process
             
         Returns:
@@ -47,9 +43,8 @@ class TableExtractor:
         """
         all_tables = []
         
-        for page_num in range(min(len(pdf.pages), max_pages)):
+        for page_num, page in enumerate(pdf_doc.pages(0, min(len(pdf_doc), max_pages))):
             try:
-                page = pdf.pages[page_num]
                 page_tables = self._extract_page_tables(page, page_num + 1)
                 all_tables.extend(page_tables)
                 
@@ -60,23 +55,26 @@ class TableExtractor:
         logging.debug(f"Extracted {len(all_tables)} tables total")
         return all_tables
     
-    def _extract_page_tables(self, page: pdfplumber.page.Page, page_num: int) -> List[Dict[str, Any]]:
+    def _extract_page_tables(self, page: fitz.Page, page_num: int) -> List[Dict[str, Any]]:
         """Extract tables from a single page"""
         page_tables = []
         
         try:
+            # Line-based strategies build table edges from vector graphics, so a
+            # page without any cannot contain a table
+            paths = page.get_drawings()
+            if not paths:
+                return page_tables
+            
             # Find tables using multiple strategies
-            tables = page.find_tables(table_settings=self.table_settings)
+            tables = page.find_tables(paths=paths, **self.table_settings).tables
             
-            # If no tables found with strict settings, try relaxed settings
-            if not tables:
+            # If no tables found with strict settings, try relaxed settings; they only
+            # differ by also using fill-only rectangles, so skip them when there are none
+            if not tables and self._has_filled_rects(paths):
                 relaxed_settings = self.table_settings.copy()
-                relaxed_settings.update({
-                    "vertical_strategy": "lines",
-                    "horizontal_strategy": "lines",
-                    "intersection_strategy": "lines"
-                })
-                tables = page.find_tables(table_settings=relaxed_settings)
+                relaxed_settings["strategy"] = "lines"
+                tables = page.find_tables(**relaxed_settings).tables
             
             for table_idx, table in enumerate(tables):
                 try:
@@ -93,7 +91,15 @@ class TableExtractor:
         
         return page_tables
     
-    def _process_table(self, table: pdfplumber.table.Table, page_num: int, table_idx: int) -> Optional[Dict[str, Any]]:
+    def _has_filled_rects(self, paths: List[Dict[str, Any]]) -> bool:
+        """Check for fill-only paths that the "lines_strict" strategy ignores but "lines" uses"""
+        snap = self.table_settings["snap_tolerance"]
+        return any(
+            path["type"] == "f" and path["rect"].width > snap and path["rect"].height > snap
+            for path in paths
+        )
+    
+    def _process_table(self, table: fitz.table.Table, page_num: int, table_idx: int) -> Optional[Dict[str, Any]]:
         """Process individual table and extract structured data"""
         try:
             # Extract table data
@@ -110,29 +116,28 @@ class TableExtractor:
             if len(filtered_data) < self.min_rows:
                 return None
             
-            # Normalize text in all cells
+            # Normalize text in all cells, tracking the widest row as we go
             normalized_data = []
+            max_cols = 0
             for row in filtered_data:
-                normalized_row = []
-                for cell in row:
-                    if cell is None:
-                        normalized_row.append("")
-                    else:
-                        normalized_text = normalize_unicode_text(str(cell))
-                        normalized_row.append(normalized_text)
+                normalized_row = [
+                    "" if cell is None
+                    else normalize_unicode_text(cell if isinstance(cell, str) else str(cell))
+                    for cell in row
+                ]
                 normalized_data.append(normalized_row)
+                max_cols = max(max_cols, len(normalized_row))
             
             # Check minimum columns
-            max_cols = max(len(row) for row in normalized_data)
             if max_cols < self.min_cols:
                 return None
             
             # Standardize row lengths
             standardized_data = []
             for row in normalized_data:
-                while len(row) < max_cols:
-                    row.append("")
-                standardized_data.append(row[:max_cols])
+                if len(row) < max_cols:
+                    row = row + [""] * (max_cols - len(row))
+                standardized_data.append(row)
             
             # Detect table structure
             structure_info = detect_table_structure(standardized_data)
@@ -153,7 +158,7 @@ class TableExtractor:
                 "rows": data_rows,
                 "row_count": len(data_rows),
                 "column_count": max_cols,
-                "bbox": table.bbox,
+                "bbox": list(table.bbox),
                 "structure": structure_info
             }
             
@@ -172,6 +177,6 @@ class TableExtractor:
         normalized = normalize_unicode_text(text)
         
         # Remove excessive whitespace
-        cleaned = re.sub(r'\s+', ' ', normalized).strip()
+        cleaned = ' '.join(normalized.split())
         
         return cleaned
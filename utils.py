@@ -2,11 +2,71 @@
 Utility functions for PDF processing with multilingual support
 """
 
+import functools
 import re
+from collections import Counter
 import unicodedata
 import logging
 from typing import Dict, List, Any, Optional
 
+import numpy as np
+
+try:
+    import icu
+    _ICU_NFC = icu.Normalizer2.getNFCInstance()
+except ImportError:  # Optional ICU normalizer (PyICU)
+    _ICU_NFC = None
+
+# Patterns are compiled once at import; these helpers run on every span and table cell
+_RE_WHITESPACE = re.compile(r'[ \t\r\n]+')
+_RE_SPACES = re.compile(r' +')
+
+# str.translate deletion table for control/format/unassigned (category C) characters
+# in the Basic Multilingual Plane, except newlines and tabs
+_CONTROL_CHAR_TABLE = dict.fromkeys(
+    codepoint for codepoint in range(0x10000)
+    if unicodedata.category(chr(codepoint))[0] == 'C' and chr(codepoint) not in '\n\t'
+)
+
+# Script patterns checked in priority order by detect_document_language
+_SCRIPT_PATTERNS = [
+    (re.compile(r'[\u0600-\u06FF]'), "arabic"),
+    (re.compile(r'[\u4e00-\u9fff]'), "chinese"),
+    (re.compile(r'[\u3040-\u309f\u30a0-\u30ff]'), "japanese"),
+    (re.compile(r'[\u0590-\u05FF]'), "hebrew"),
+    (re.compile(r'[\u0400-\u04FF]'), "russian"),
+]
+# Union of the script ranges above, so Latin-only text needs a single scan
+_ANY_SCRIPT_RE = re.compile(r'[\u0400-\u04FF\u0590-\u05FF\u0600-\u06FF\u3040-\u30ff\u4e00-\u9fff]')
+_RE_ENGLISH = re.compile(r'[a-z\s]{10,}')
+
+# Bidirectional class of every BMP code point, bucketed as 0 = neutral/other,
+# 1 = left-to-right (L), 2 = right-to-left (R, AL), for vectorized lookups
+_BIDI_CLASS_TABLE = np.array(
+    [1 if bidi == 'L' else 2 if bidi in ('R', 'AL') else 0
+     for bidi in map(unicodedata.bidirectional, map(chr, range(0x10000)))],
+    dtype=np.uint8
+)
+
+# Heading indicators, fused into one anchored alternation so a single match covers all of them
+_HEADING_INDICATORS = [
+    # Numbers at start
+    r'\d+\.?\s',
+    # Roman numerals (uppercase only, so words like "vi" or "xi" are not numerals)
+    r'(?-i:[IVX]+)\.?\s',
+    # Letters followed by period (ASCII only; case folding would also admit ı, İ and ſ)
+    r'(?-i:[A-Za-z])\.?\s',
+    # "Chapter", "Section", etc.
+    r'(?:chapter|section|part|appendix|introduction|conclusion)\s+',
+    # Arabic section indicators
+    r'(?:الفصل|القسم|الجزء|المقدمة|الخاتمة)\s+',
+    # Chinese section indicators
+    r'第.*[章节]|附录',
+]
+_HEADING_RE = re.compile('^(?:' + '|'.join(_HEADING_INDICATORS) + ')', re.IGNORECASE)
+
+_RE_DIGIT = re.compile(r'\d')
+
 def normalize_unicode_text(text: str) -> str:
     """
     Normalize Unicode text for consistent processing
@@ -20,19 +80,41 @@ def normalize_unicode_text(text: str) -> str:
     if not text:
         return ""
     
+    # Printable ASCII is already NFC and has no control characters or line
+    # breaks, so only spaces need collapsing; this is the common case for PDF text
+    if text.isascii() and text.isprintable():
+        return _RE_SPACES.sub(' ', text).strip() if '  ' in text else text.strip()
+    
+    return _normalize_unicode_text(text)
+
+@functools.lru_cache(maxsize=1 << 16)
+def _normalize_unicode_text(text: str) -> str:
+    """
+    Full Unicode normalization behind normalize_unicode_text
+    
+    Results are cached, since table cells and headers repeat the same short strings
+    """
     try:
-        # Normalize Unicode to NFC form
-        normalized = unicodedata.normalize('NFC', text)
+        # Normalize Unicode to NFC form (both return text as-is when already NFC)
+        if _ICU_NFC is not None:
+            normalized = _ICU_NFC.normalize(text)
+        else:
+            normalized = unicodedata.normalize('NFC', text)
         
-        # Remove control characters except newlines and tabs
-        cleaned = ''.join(char for char in normalized 
-                         if unicodedata.category(char)[0] != 'C' or char in '\n\t')
+        # Printable text has no control characters or line breaks to remove
+        if normalized.isprintable():
+            return _RE_SPACES.sub(' ', normalized).strip()
         
-        # Normalize whitespace
-        cleaned = re.sub(r'[\r\n\t]+', ' ', cleaned)
-        cleaned = re.sub(r' +', ' ', cleaned)
+        # Remove control characters except newlines and tabs; the table only
+        # covers the BMP, so text with supplementary-plane characters is filtered per character
+        if max(normalized) <= '\uffff':
+            cleaned = normalized.translate(_CONTROL_CHAR_TABLE)
+        else:
+            cleaned = ''.join(char for char in normalized 
+                             if unicodedata.category(char)[0] != 'C' or char in '\n\t')
         
-        return cleaned.strip()
+        # Normalize whitespace in a single pass
+        return _RE_WHITESPACE.sub(' ', cleaned).strip()
         
     except Exception as e:
         logging.warning(f"Failed to normalize text: {str(e)}")
@@ -51,24 +133,25 @@ def detect_document_language(text: str) -> str:
     if not text:
         return "unknown"
     
+    # Only the first 1000 characters are examined, so they form the cache key
+    return _detect_sample_language(text[:1000])
+
+@functools.lru_cache(maxsize=4096)
+def _detect_sample_language(text_sample: str) -> str:
+    """Language detection for an already truncated sample, cached by sample"""
     # Simple heuristic-based language detection
-    text_sample = text[:1000].lower()
+    text_sample = text_sample.lower()
     
     # Check for common language patterns
-    if re.search(r'[\u0600-\u06FF]', text_sample):
-        return "arabic"
-    elif re.search(r'[\u4e00-\u9fff]', text_sample):
-        return "chinese"
-    elif re.search(r'[\u3040-\u309f\u30a0-\u30ff]', text_sample):
-        return "japanese"
-    elif re.search(r'[\u0590-\u05FF]', text_sample):
-        return "hebrew"
-    elif re.search(r'[\u0400-\u04FF]', text_sample):
-        return "russian"
-    elif re.search(r'[a-z\s]{10,}', text_sample):
+    if _ANY_SCRIPT_RE.search(text_sample):
+        for pattern, language in _SCRIPT_PATTERNS:
+            if pattern.search(text_sample):
+                return language
+    
+    if _RE_ENGLISH.search(text_sample):
         return "english"
-    else:
-        return "unknown"
+    
+    return "unknown"
 
 def get_text_direction(text: str) -> str:
     """
@@ -80,18 +163,21 @@ def get_text_direction(text: str) -> str:
     Returns:
         Direction: 'ltr', 'rtl', or 'mixed'
     """
-    if not text:
+    # ASCII has no right-to-left characters
+    if not text or text.isascii():
         return "ltr"
     
-    rtl_chars = 0
-    ltr_chars = 0
-    
-    for char in text:
-        direction = unicodedata.bidirectional(char)
-        if direction in ('R', 'AL'):  # Right-to-left
-            rtl_chars += 1
-        elif direction in ('L',):  # Left-to-right
-            ltr_chars += 1
+    # BMP-only text encodes to one UTF-16 unit per character, so the code points
+    # index the bidi table directly; otherwise count classes per character
+    encoded = text.encode('utf-16-le', 'surrogatepass')
+    if len(encoded) == 2 * len(text):
+        counts = np.bincount(_BIDI_CLASS_TABLE[np.frombuffer(encoded, dtype=np.uint16)], minlength=3)
+        ltr_chars = int(counts[1])  # Left-to-right
+        rtl_chars = int(counts[2])  # Right-to-left
+    else:
+        directions = Counter(map(unicodedata.bidirectional, text))
+        rtl_chars = directions['R'] + directions['AL']  # Right-to-left
+        ltr_chars = directions['L']  # Left-to-right
     
     total_directional = rtl_chars + ltr_chars
     if total_directional == 0:
@@ -116,40 +202,21 @@ def is_likely_heading(text: str) -> bool:
     Returns:
         True if text appears to be a heading
     """
-    if not text or len(text) < 2:
+    # Skip very short or very long text (likely paragraphs)
+    if not text or not 2 <= len(text) <= 200:
         return False
     
-    # Skip very long text (likely paragraphs)
-    if len(text) > 200:
-        return False
-    
-    # Check for heading indicators
-    heading_indicators = [
-        # Numbers at start
-        r'^\d+\.?\s',
-        # Roman numerals
-        r'^[IVX]+\.?\s',
-        # Letters followed by period
-        r'^[A-Za-z]\.?\s',
-        # "Chapter", "Section", etc.
-        r'^(chapter|section|part|appendix|introduction|conclusion)\s+',
-        # Arabic section indicators
-        r'^(الفصل|القسم|الجزء|المقدمة|الخاتمة)\s+',
-        # Chinese section indicators
-        r'^(第.*章|第.*节|附录)',
-    ]
-    
-    text_lower = text.lower()
-    for pattern in heading_indicators:
-        if re.search(pattern, text_lower):
-            return True
-    
     # Check if text ends with colon (common in headings)
     if text.rstrip().endswith(':'):
         return True
     
-    # Check capitalization patterns
-    words = text.split()
+    # Check for heading indicators; the match is anchored, so most text fails on its first character
+    if _HEADING_RE.match(text):
+        return True
+    
+    # Check capitalization patterns, splitting no further than needed to tell
+    # whether the text has more than 8 words
+    words = text.split(maxsplit=8)
     if len(words) <= 8:  # Short text
         # Title case
         if all(word[0].isupper() if word else False for word in words if len(word) > 2):
@@ -161,6 +228,11 @@ def is_likely_heading(text: str) -> bool:
     
     return False
 
+def _is_numeric_cell(value: str) -> bool:
+    """Check whether a non-empty, stripped cell is digits with at most one decimal point"""
+    # Equivalent to fullmatching \d+\.?\d*, since \d matches exactly the characters str.isdecimal accepts
+    return value[0].isdecimal() and value.replace('.', '', 1).isdecimal()
+
 def detect_table_structure(data: List[List[str]]) -> Dict[str, Any]:
     """
     Analyze table structure to detect headers and data patterns
@@ -198,8 +270,9 @@ def detect_table_structure(data: List[List[str]]) -> Dict[str, Any]:
         if not cell:
             continue
             
-        # Headers often don't contain numbers
-        if not re.search(r'\d', cell):
+        # Headers often don't contain numbers; the digit check is reused below
+        cell_has_digit = _RE_DIGIT.search(cell) is not None
+        if not cell_has_digit:
             header_score += 1
         
         # Headers are often shorter
@@ -209,7 +282,7 @@ def detect_table_structure(data: List[List[str]]) -> Dict[str, Any]:
         # Compare with second row if available
         if i < len(second_row) and second_row[i]:
             # If first row is text and second row has numbers
-            if not re.search(r'\d', cell) and re.search(r'\d', second_row[i]):
+            if not cell_has_digit and _RE_DIGIT.search(second_row[i]):
                 header_score += 1
     
     structure["has_header"] = header_score > num_cols * 0.6
@@ -217,16 +290,20 @@ def detect_table_structure(data: List[List[str]]) -> Dict[str, Any]:
     # Analyze column types
     start_row = 1 if structure["has_header"] else 0
     
-    for col_idx in range(num_cols):
-        column_values = [row[col_idx] if col_idx < len(row) else "" for row in data[start_row:]]
-        column_values = [val for val in column_values if val.strip()]
+    # Transpose once, padding or trimming rows to the header width
+    rows = [row if len(row) == num_cols else row[:num_cols] + [""] * (num_cols - len(row))
+            for row in data[start_row:]]
+    
+    for col_idx, column in enumerate(zip(*rows)):
+        # Strip each value once; the numeric check below reuses the stripped text
+        column_values = [val for val in map(str.strip, column) if val]
         
         if not column_values:
             structure["empty_columns"].append(col_idx)
             continue
         
         # Check if column contains mostly numbers
-        numeric_count = sum(1 for val in column_values if re.search(r'^\d+\.?\d*$', val.strip()))
+        numeric_count = sum(1 for val in column_values if _is_numeric_cell(val))
         numeric_ratio = numeric_count / len(column_values)
         
         if numeric_ratio > 0.7:
@@ -5,25 +5,156 @@ Simple web interface for the Multilingual PDF Processor
 
 import os
 import json
-import tempfile
-import shutil
+import hashlib
+import io
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, Response, request, jsonify
+from flask.json.provider import DefaultJSONProvider
 from werkzeug.utils import secure_filename
 from pdf_processor import PDFProcessor
 
+try:
+    from waitress import serve
+except ImportError:  # Optional production WSGI server
+    serve = None
+
+try:
+    from flask_compress import Compress
+except ImportError:  # Optional response compression
+    Compress = None
+
+try:
+    import orjson
+except ImportError:  # Optional faster JSON encoder
+    orjson = None
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider that encodes jsonify responses with orjson, writing bytes directly"""
+    
+    def _option(self, pretty=False):
+        """orjson options matching the provider's sort_keys setting"""
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return option
+    
+    def dumps(self, obj, **kwargs):
+        # orjson has no equivalent for arbitrary json.dumps arguments, so
+        # calls that pass any go through the standard library encoder
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._option()).decode()
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = self.compact is False or (self.compact is None and self._app.debug)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=self._option(pretty)), mimetype=self.mimetype
+        )
+
 app = Flask(__name__)
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
-app.config['UPLOAD_FOLDER'] = tempfile.mkdtemp()
+
+# Outline and table JSON is repetitive and compresses well; level 4 keeps CPU cost low
+app.config['COMPRESS_MIMETYPES'] = ['application/json']
+app.config['COMPRESS_LEVEL'] = 4
+if orjson is not None:
+    app.json = OrjsonProvider(app)
+app.json.compact = True
+if Compress is not None:
+    Compress(app)
 
 ALLOWED_EXTENSIONS = {'pdf'}
 
+# PDFs are processed in worker processes: PyMuPDF is not thread-safe and
+# extraction is CPU-bound, so this spreads uploads across cores. Each worker
+# builds one processor when it starts and reuses it for every document.
+_WORKER_PROCESSOR = None
+
+def _init_worker():
+    global _WORKER_PROCESSOR
+    _WORKER_PROCESSOR = PDFProcessor(max_pages=50)
+
+def _process_upload(data, filename):
+    return _WORKER_PROCESSOR.process_stream(io.BytesIO(data), filename)
+
+# Workers come from a forkserver rather than being forked from a multi-threaded
+# server process. The pool is created on first use and replaced when a worker
+# dies (e.g. a native crash on a malformed PDF), which breaks the whole pool.
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
+def _get_pool(broken=None):
+    """Return the worker pool, replacing it if it is missing or is the given broken pool"""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None or _POOL is broken:
+            # A broken pool has already failed all of its futures; shutting it
+            # down only releases its resources
+            if _POOL is not None:
+                _POOL.shutdown(wait=False)
+            _POOL = ProcessPoolExecutor(
+                max_workers=os.cpu_count() or 1,
+                mp_context=multiprocessing.get_context('forkserver'),
+                initializer=_init_worker
+            )
+        return _POOL
+
+def _process_uploads(uploads):
+    """Process (filename, data) uploads in the pool, returning a result or exception per file"""
+    pool = _get_pool()
+    try:
+        futures = [pool.submit(_process_upload, data, filename) for filename, data in uploads]
+    except BrokenProcessPool:
+        # A worker died since the last request; start over with a fresh pool
+        pool = _get_pool(broken=pool)
+        futures = [pool.submit(_process_upload, data, filename) for filename, data in uploads]
+    
+    outcomes = []
+    for (filename, data), future in zip(uploads, futures):
+        try:
+            outcomes.append(future.result())
+        except BrokenProcessPool:
+            # A worker died, failing every pending document; retry this one alone
+            # in a fresh pool so a crashing PDF only fails its own entry. Only the
+            # pool the document ran in is replaced, never one that is still healthy.
+            retry_pool = _get_pool(broken=pool)
+            try:
+                outcomes.append(retry_pool.submit(_process_upload, data, filename).result())
+            except BrokenProcessPool as e:
+                _get_pool(broken=retry_pool)
+                outcomes.append(e)
+            except Exception as e:
+                outcomes.append(e)
+        except Exception as e:
+            outcomes.append(e)
+    
+    return outcomes
+
+# The index page is static HTML, so it is read once and served with
+# caching headers; browsers revalidate with If-None-Match and get a 304
+_INDEX_HTML = (Path(app.root_path) / 'templates' / 'index.html').read_bytes()
+_INDEX_ETAG = hashlib.md5(_INDEX_HTML).hexdigest()
+
+def _index_response():
+    response = Response(_INDEX_HTML, mimetype='text/html')
+    response.cache_control.public = True
+    response.cache_control.max_age = 3600
+    response.set_etag(_INDEX_ETAG)
+    return response.make_conditional(request)
+
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 @app.route('/')
 def index():
-    return render_template('index.html')
+    return _index_response()
 
 @app.route('/api/process', methods=['POST'])
 def process_pdf():
@@ -31,26 +162,32 @@ def process_pdf():
         if 'file' not in request.files:
             return jsonify({'error': 'No file provided'}), 400
         
-        file = request.files['file']
-        if file.filename == '':
-            return jsonify({'error': 'No file selected'}), 400
+        files = request.files.getlist('file')
+        for file in files:
+            if file.filename == '':
+                return jsonify({'error': 'No file selected'}), 400
+            
+            if not allowed_file(file.filename):
+                return jsonify({'error': 'Only PDF files are allowed'}), 400
         
-        if not allowed_file(file.filename):
-            return jsonify({'error': 'Only PDF files are allowed'}), 400
+        # Process the uploaded PDFs in parallel, straight from memory
+        uploads = [(secure_filename(file.filename), file.read()) for file in files]
+        outcomes = _process_uploads(uploads)
         
-        # Save uploaded file
-        filename = secure_filename(file.filename)
-        filepath = Path(app.config['UPLOAD_FOLDER']) / filename
-        file.save(str(filepath))
+        if len(outcomes) == 1:
+            if isinstance(outcomes[0], Exception):
+                raise outcomes[0]
+            return jsonify(outcomes[0])
         
-        # Process the PDF
-        processor = PDFProcessor(max_pages=50)
-        result = processor.process_pdf(filepath)
+        # Several files: one failed PDF is reported in its entry instead of failing the batch
+        results = []
+        for (filename, _), outcome in zip(uploads, outcomes):
+            if isinstance(outcome, Exception):
+                results.append({'filename': filename, 'error': str(outcome)})
+            else:
+                results.append(outcome)
         
-        # Clean up uploaded file
-        filepath.unlink()
-        
-        return jsonify(result)
+        return jsonify({'results': results})
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -72,11 +209,12 @@ def status():
 
 @app.route('/templates/index.html')
 def serve_template():
-    return send_file('templates/index.html')
+    return _index_response()
 
 if __name__ == '__main__':
-    # Create templates directory if it doesn't exist
-    os.makedirs('templates', exist_ok=True)
-    
-    # Start the web server
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    # Start the web server; waitress handles requests concurrently, the Flask
+    # development server is only a fallback when it is not installed
+    if serve is not None:
+        serve(app, host='0.0.0.0', port=5000, threads=8)
+    else:
+        app.run(host='0.0.0.0', port=5000, threaded=True)